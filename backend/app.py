@@ -1,90 +1,261 @@
-from flask import Flask, jsonify, request
-from flask_cors import CORS
-import os
-import json
-from dotenv import load_dotenv
+# Process-pool workers (forkserver/spawn) re-import the main script as __mp_main__.
+# They only run services.pdf_parser, so under `python app.py` they must not import
+# Flask/SQLAlchemy or build a second app (engine, migrations, job queue) against the DB.
+if __name__ != "__mp_main__":
+    from flask import Flask, Response, g, has_request_context, jsonify, request
+    from flask_cors import CORS
+    import os
+    import time
+    from dotenv import load_dotenv
+    from sqlalchemy import event
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.orm import undefer
 
-# Load .env from project root
-env_path = os.path.join(os.path.dirname(__file__), '..', '.env')
-load_dotenv(env_path)
+    # Load .env from project root
+    env_path = os.path.join(os.path.dirname(__file__), '..', '.env')
+    load_dotenv(env_path)
 
-from services.pdf_parser import extract_text_from_pdf
-from services.llm_generator import generate_quiz_from_text
+    from services import metrics, quiz_cache, quiz_pages, sync_delta
+    from services.sync_snapshot import SyncBundle, SyncSnapshot, pick_encoding
+    from services.upload_jobs import UploadJobQueue, QueueFullError
 
-from database.models import db, Quiz
+    from database.models import db, Quiz, backfill_change_log, upgrade_schema
 
-load_dotenv()
+    load_dotenv()
 
 
-app = Flask(__name__)
-CORS(app)
+    app = Flask(__name__)
+    CORS(app)
 
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///studybuddy.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///studybuddy.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # pooled connections shared by request threads and upload job workers; only for a
+    # SQLite file (in-memory SQLite uses StaticPool, other backends keep their defaults).
+    # The busy timeout comes from the PRAGMA listener in database/models.py.
+    _db_url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if _db_url.get_backend_name() == "sqlite" and _db_url.database not in (None, "", ":memory:"):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+            "max_overflow": 10,
+        }
 
-db.init_app(app)
+    db.init_app(app)
 
-with app.app_context():
-    db.create_all()
+    with app.app_context():
+        db.create_all()
+        upgrade_schema()
+        backfill_change_log()
 
-@app.route('/')
-def home():
-    return jsonify({
-        "message": "Study Buddy API is running...",
-        "status": "online"
-        })
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def count_query(conn, cursor, statement, parameters, context, executemany):
+            metrics.SQL_QUERIES.inc()
+            if has_request_context():
+                g.sql_queries = g.get("sql_queries", 0) + 1
 
-@app.route('/api/upload', methods=['POST'])
-def upload_file():
-    if 'file' not in request.files:
-        return jsonify({"error": "No file uploaded"}), 400
+    # STUDYBUDDY_FAKE_LLM=1 swaps OpenAI for a local deterministic generator
+    if os.getenv("STUDYBUDDY_FAKE_LLM") == "1":
+        from services import fake_llm as llm
+    else:
+        from services import llm_generator as llm
 
-    file = request.files["file"]
+    sync_snapshot = SyncSnapshot()
+    sync_bundle = SyncBundle()
 
-    if not file.filename.lower().endswith('.pdf'):
-        return jsonify({"error": "Invalid file type. Please upload a PDF"}), 400
+    upload_jobs = UploadJobQueue(
+        app,
+        llm,
+        max_workers=int(os.getenv("UPLOAD_WORKERS", "4")),
+        parse_workers=int(os.getenv("PARSE_WORKERS", "2")),
+        max_queued=int(os.getenv("UPLOAD_QUEUE_SIZE", "16")),
+        chunked=os.getenv("QUIZ_CHUNKED_MODE", "1") == "1",
+    )
 
-    try:
-# 1. Parse PDF
-        extracted_text = extract_text_from_pdf(file.stream)
-        quiz_json = generate_quiz_from_text(extracted_text)
-        
-        topic = quiz_json.get("meta", {}).get("topic", file.filename)
+    SYNC_ENDPOINTS = ("sync_device", "sync_bundle_file")
 
-        new_quiz = Quiz(
-            filename=file.filename,
-            topic=topic,
-            quiz_data=json.dumps(quiz_json)
+
+    @app.before_request
+    def start_request_metrics():
+        g.request_started = time.perf_counter()
+        g.sql_queries = 0
+
+
+    @app.after_request
+    def record_request_metrics(response):
+        endpoint = request.endpoint or "unmatched"
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - g.request_started,
+            endpoint=endpoint, method=request.method, status=response.status_code,
         )
+        metrics.SQL_QUERIES_PER_REQUEST.observe(g.sql_queries, endpoint=endpoint)
 
-        db.session.add(new_quiz)
-        db.session.commit()
+        if endpoint in SYNC_ENDPOINTS and response.status_code == 200 and response.content_length is not None:
+            metrics.SYNC_PAYLOAD_BYTES.observe(
+                response.content_length,
+                endpoint=endpoint, encoding=response.headers.get("Content-Encoding", "identity"),
+            )
+        return response
+
+
+    @app.route('/')
+    def home():
+        return jsonify({
+            "message": "Study Buddy API is running...",
+            "status": "online"
+            })
+
+    @app.route('/api/upload', methods=['POST'])
+    def upload_file():
+        if 'file' not in request.files:
+            return jsonify({"error": "No file uploaded"}), 400
+
+        file = request.files["file"]
+
+        if not file.filename.lower().endswith('.pdf'):
+            return jsonify({"error": "Invalid file type. Please upload a PDF"}), 400
+
+        try:
+            job = upload_jobs.submit(file.read(), file.filename)
+        except QueueFullError as e:
+            return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
 
         return jsonify({
-            "message": "Quiz generated and saved",
-            "filename": new_quiz.id,
-            "topic": new_quiz.topic
-        }), 201
+            "message": "Upload accepted",
+            "job_id": job.id,
+            "status_url": f"/api/jobs/{job.id}"
+        }), 202
 
-    except Exception as e:
-            print(f"Error: {e}")
+
+    @app.route('/api/jobs/<job_id>', methods=['GET'])
+    def job_status(job_id):
+        job = upload_jobs.get(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+
+        return jsonify(job.to_dict()), 200
+
+
+    # endpoint for raspberry pi to sync quizzes
+    # GET /api/sync               -> every quiz (legacy full mode)
+    # GET /api/sync?since=<cursor> -> only quizzes changed/deleted after cursor, paginated
+    @app.route('/api/sync', methods=['GET'])
+    def sync_device():
+        since = request.args.get("since")
+        if since is not None:
+            return sync_delta_page(since)
+
+        try: 
+            # full mode is served from a pre-serialized (and pre-compressed) snapshot
+            encoding = pick_encoding(request.accept_encodings)
+            head, body = sync_snapshot.get(encoding)
+
+            etag = f"sync-full-{head}-{encoding}"
+            headers = {"ETag": f'"{etag}"', "Vary": "Accept-Encoding"}
+            if etag in request.if_none_match:
+                return "", 304, headers
+
+            if encoding != "identity":
+                headers["Content-Encoding"] = encoding
+            return Response(body, status=200, mimetype="application/json", headers=headers, direct_passthrough=True)
+        except Exception as e:
             return jsonify({"error": str(e)}), 500
 
 
-# endpoint for raspberry pi to sync quizzes
-@app.route('/api/sync', methods=['GET'])
-def sync_device():
-    try: 
-        quizzes = Quiz.query.order_by(Quiz.created_at.desc()).all()
+    # same library as full-mode /api/sync, as a binary bundle the pi can mmap
+    @app.route('/api/sync/bundle', methods=['GET'])
+    def sync_bundle_file():
+        try:
+            head, body = sync_bundle.get()
+
+            etag = f"bundle-{head}"
+            headers = {"ETag": f'"{etag}"'}
+            if etag in request.if_none_match:
+                return "", 304, headers
+
+            return Response(body, status=200, mimetype="application/octet-stream", headers=headers, direct_passthrough=True)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+
+    def sync_delta_page(since):
+        try:
+            since = int(since)
+            limit = int(request.args.get("limit", sync_delta.DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return jsonify({"error": "since and limit must be integers"}), 400
+        if since < 0 or limit < 1:
+            return jsonify({"error": "since must be >= 0 and limit >= 1"}), 400
+        limit = min(limit, sync_delta.MAX_PAGE_SIZE)
+
+        try:
+            device_id = request.headers.get("X-Device-Id") or request.args.get("device_id")
+            if device_id:
+                # asking for changes after `since` means the device already has everything up to it
+                sync_delta.touch_device(device_id[:64], since)
+
+            head = sync_delta.current_cursor()
+            etag = sync_delta.make_etag(since, limit, head)
+            if etag in request.if_none_match:
+                return "", 304, {"ETag": f'"{etag}"'}
+
+            quizzes, deleted, cursor, has_more = sync_delta.changes_since(since, limit)
+
+            return jsonify({
+                "quizzes": quizzes,
+                "deleted": deleted,
+                "cursor": cursor,
+                "has_more": has_more
+            }), 200, {"ETag": f'"{etag}"'}
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+
+    # lightweight listing for the dashboard: summary columns only, newest first
+    # GET /api/quizzes?limit=<n>&after=<next token from the previous page>
+    @app.route('/api/quizzes', methods=['GET'])
+    def list_quizzes():
+        try:
+            limit = min(max(int(request.args.get("limit", 20)), 1), 100)
+            after = quiz_pages.decode_token(request.args.get("after"))
+        except ValueError:
+            return jsonify({"error": "Invalid limit or page token"}), 400
+
+        try:
+            quizzes, next_token = quiz_pages.summary_page(limit, after)
+            return jsonify({"quizzes": quizzes, "next": next_token}), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+
+    @app.route('/api/quizzes/<int:quiz_id>', methods=['GET'])
+    def get_quiz(quiz_id):
+        quiz = db.session.get(Quiz, quiz_id, options=[undefer(Quiz.quiz_data)])
+        if quiz is None:
+            return jsonify({"error": "Quiz not found"}), 404
+
+        return jsonify(quiz.to_dict()), 200
+
+
+    @app.route('/api/quizzes/<int:quiz_id>', methods=['DELETE'])
+    def delete_quiz(quiz_id):
+        quiz = db.session.get(Quiz, quiz_id)
+        if quiz is None:
+            return jsonify({"error": "Quiz not found"}), 404
+
+        db.session.delete(quiz)
+        db.session.commit()
+        return "", 204
+
+
+    # prometheus text format
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics_endpoint():
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
-        payload = []
-        for q in quizzes:
-            payload.append(q.to_dict())
 
-        return jsonify({"quizzes": payload}), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    @app.route('/api/cache/stats', methods=['GET'])
+    def cache_stats():
+        return jsonify(quiz_cache.get_stats()), 200
 
 
-if __name__ == "__main__":
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    if __name__ == "__main__":
+        app.run(debug=True, port=5000)
@@ -0,0 +1,93 @@
+"""Round-trip check and access cost of the /api/sync/bundle format vs. JSON /api/sync.
+
+Run from backend/:  python -m benchmarks.bench_bundle [--quizzes 1000]
+
+Every quiz read back from the bundle must equal Quiz.to_dict(); the script
+exits non-zero otherwise. Uses a throwaway SQLite database.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_db_dir = tempfile.mkdtemp(prefix="studybuddy-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault("STUDYBUDDY_FAKE_LLM", "1")
+
+from sqlalchemy.orm import undefer
+
+import app as studybuddy
+from benchmarks.bench_sync import fill_library
+from database.models import Quiz
+from services.quiz_bundle import BundleReader
+
+# shapes the bundle has to fall back to JSON for, or store as null
+ODD_QUIZZES = [
+    {"meta": {"topic": "Odd", "total_questions": 2}, "source": "manual",
+     "questions": [{"id": 1, "type": "mcq", "question": "No explanation", "options": ["a", "b"], "correct_index": 1},
+                   {"id": 2, "type": "true_false", "statement": "Ünïcødé ✓", "answer": True}]},
+    {"meta": {}, "questions": []},
+]
+
+
+def _timed(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = (time.perf_counter() - started) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quizzes", type=int, default=1000)
+    args = parser.parse_args()
+
+    fill_library(args.quizzes)
+    with studybuddy.app.app_context():
+        for number, quiz_json in enumerate(ODD_QUIZZES):
+            studybuddy.db.session.add(Quiz(filename=f"odd-{number}.pdf", topic=None, quiz_data=json.dumps(quiz_json)))
+        studybuddy.db.session.commit()
+        expected = [
+            q.to_dict() for q in
+            Quiz.query.options(undefer(Quiz.quiz_data)).order_by(Quiz.created_at.desc(), Quiz.id.desc())
+        ]
+
+    client = studybuddy.app.test_client()
+    bundle = client.get("/api/sync/bundle").get_data()
+    sync_json = client.get("/api/sync").get_data()
+
+    path = os.path.join(_db_dir, "library.sbqb")
+    with open(path, "wb") as f:
+        f.write(bundle)
+
+    with BundleReader.open(path) as reader:
+        mismatches = [i for i in range(reader.quiz_count) if reader.quiz(i) != expected[i]]
+        if reader.quiz_count != len(expected) or mismatches:
+            print(f"round-trip FAILED: {reader.quiz_count} vs {len(expected)} quizzes, mismatches at {mismatches[:10]}")
+            sys.exit(1)
+        print(f"round-trip ok: {reader.quiz_count} quizzes equal Quiz.to_dict()")
+
+    middle = len(expected) // 2
+    _, json_ms, json_peak = _timed(lambda: json.loads(sync_json)["quizzes"][middle]["quiz_data"]["questions"][0])
+
+    def bundle_one_question():
+        with BundleReader.open(path) as reader:
+            return reader.question(middle, 0)
+
+    _, bundle_ms, bundle_peak = _timed(bundle_one_question)
+
+    print(f"{'format':<8} {'bytes':>10} {'one question ms':>16} {'peak alloc KB':>14}")
+    print(f"{'json':<8} {len(sync_json):>10} {json_ms:>16.2f} {json_peak / 1024:>14.1f}")
+    print(f"{'bundle':<8} {len(bundle):>10} {bundle_ms:>16.2f} {bundle_peak / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Offline end-to-end benchmark: upload and sync throughput and p50/p99 latency.
+
+Runs the real Flask app (with the real OpenAI client) on a local port, pointed
+at benchmarks/fake_openai_server.py, and drives it over HTTP with generated PDFs.
+Nothing leaves the machine and studybuddy.db is not touched.
+
+Run from backend/:
+    python -m benchmarks.bench_e2e --uploads 40 --concurrency 8 --llm-latency-ms 800
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.fake_openai_server import start_fake_openai
+from benchmarks.synthetic_pdf import make_pdf
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _multipart(field, filename, data):
+    boundary = uuid.uuid4().hex
+    body = b"".join([
+        f"--{boundary}\r\n".encode(),
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'.encode(),
+        b"Content-Type: application/pdf\r\n\r\n",
+        data,
+        f"\r\n--{boundary}--\r\n".encode(),
+    ])
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def _get_json(url):
+    with urllib.request.urlopen(url) as response:
+        return json.loads(response.read())
+
+
+def upload_and_wait(base_url, pdf_bytes, filename, poll_s=0.05):
+    """POST a PDF and poll its job; returns (seconds until done, rejected-with-503 count)."""
+    body, content_type = _multipart("file", filename, pdf_bytes)
+    started = time.perf_counter()
+    rejected = 0
+    while True:
+        request = urllib.request.Request(f"{base_url}/api/upload", data=body, headers={"Content-Type": content_type})
+        try:
+            with urllib.request.urlopen(request) as response:
+                job = json.loads(response.read())
+            break
+        except urllib.error.HTTPError as e:
+            if e.code != 503:
+                raise
+            # backpressure: the queue is full, retry shortly
+            rejected += 1
+            time.sleep(min(float(e.headers.get("Retry-After", 1)), 0.5))
+
+    while True:
+        status = _get_json(f"{base_url}{job['status_url']}")
+        if status["stage"] == "done":
+            return time.perf_counter() - started, rejected
+        if status["stage"] == "failed":
+            raise RuntimeError(f"upload job failed: {status['error']}")
+        time.sleep(poll_s)
+
+
+def timed_get(url):
+    started = time.perf_counter()
+    with urllib.request.urlopen(urllib.request.Request(url, headers={"Accept-Encoding": "gzip"})) as response:
+        size = len(response.read())
+    return time.perf_counter() - started, size
+
+
+def run_phase(label, tasks, concurrency):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda task: task(), tasks))
+    wall = time.perf_counter() - started
+    latencies = [r[0] * 1000 for r in results]
+    print(f"{label:<14} n={len(results):<5} {len(results) / wall:>8.2f} req/s"
+          f"  p50 {percentile(latencies, 50):>8.1f} ms  p99 {percentile(latencies, 99):>8.1f} ms")
+    return results
+
+
+def stage_breakdown(base_url):
+    text = urllib.request.urlopen(f"{base_url}/api/metrics").read().decode("utf-8")
+    sums = dict(re.findall(r'studybuddy_upload_stage_seconds_sum\{stage="(\w+)"\} (\S+)', text))
+    counts = dict(re.findall(r'studybuddy_upload_stage_seconds_count\{stage="(\w+)"\} (\S+)', text))
+    print("upload stages (mean ms):", ", ".join(
+        f"{stage} {float(sums[stage]) / float(counts[stage]) * 1000:.1f}" for stage in sorted(sums)
+    ))
+    queries = re.search(r"^studybuddy_sql_queries_total (\S+)$", text, re.MULTILINE)
+    print(f"sql statements total: {queries.group(1) if queries else 0}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--llm-jitter-ms", type=float, default=200)
+    parser.add_argument("--upload-workers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--sync-requests", type=int, default=200)
+    parser.add_argument("--sync-concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    fake_server, fake_base_url = start_fake_openai(args.llm_latency_ms, args.llm_jitter_ms)
+
+    db_dir = tempfile.mkdtemp(prefix="studybuddy-e2e-")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(db_dir, 'bench.db')}",
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": fake_base_url,
+        "UPLOAD_WORKERS": str(args.upload_workers),
+        "UPLOAD_QUEUE_SIZE": str(args.queue_size),
+    })
+    os.environ.pop("STUDYBUDDY_FAKE_LLM", None)
+
+    from werkzeug.serving import make_server
+    import app as studybuddy
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, studybuddy.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    print(f"fake LLM {args.llm_latency_ms:.0f}±{args.llm_jitter_ms:.0f} ms, "
+          f"{args.upload_workers} upload workers, {args.pages}-page PDFs")
+
+    pdfs = [make_pdf(args.pages, seed=i) for i in range(args.uploads)]
+    uploads = run_phase(
+        "upload",
+        [lambda i=i: upload_and_wait(base_url, pdfs[i], f"bench-{i}.pdf") for i in range(args.uploads)],
+        args.concurrency,
+    )
+    print(f"{'':<14} 503 retries: {sum(r[1] for r in uploads)}, LLM calls: {fake_server.stats['requests']}")
+
+    run_phase("upload (dup)", [lambda: upload_and_wait(base_url, pdfs[0], "dup.pdf")] * args.concurrency,
+              args.concurrency)
+
+    for label, path in (("sync full", "/api/sync"), ("sync delta", "/api/sync?since=0"),
+                        ("sync bundle", "/api/sync/bundle"), ("quiz list", "/api/quizzes")):
+        run_phase(label, [lambda path=path: timed_get(base_url + path)] * args.sync_requests, args.sync_concurrency)
+
+    stage_breakdown(base_url)
+
+    server.shutdown()
+    studybuddy.upload_jobs.shutdown()
+    fake_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
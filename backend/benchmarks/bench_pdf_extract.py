@@ -0,0 +1,58 @@
+"""Pages/sec of the serial extraction path vs. the process-pool engine.
+
+Run from backend/:  python -m benchmarks.bench_pdf_extract [--pages 300 500] [--workers 4]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.synthetic_pdf import make_pdf
+from services.pdf_parser import extract_text_from_pdf
+
+CHAR_BUDGET = 15000
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 300, 600])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        # warm the workers up so process start-up is not measured
+        list(pool.map(abs, range(args.workers)))
+
+        print(f"{'pages':>6} {'mode':<24} {'seconds':>8} {'pages/s':>9}")
+        for page_count in args.pages:
+            pdf_bytes = make_pdf(page_count)
+            cases = [
+                ("serial, full", None, None),
+                (f"pool x{args.workers}, full", pool, None),
+                ("serial, 15k budget", None, CHAR_BUDGET),
+                (f"pool x{args.workers}, 15k budget", pool, CHAR_BUDGET),
+            ]
+            for label, executor, budget in cases:
+                seconds = _time(
+                    lambda: extract_text_from_pdf(io.BytesIO(pdf_bytes), max_chars=budget, executor=executor),
+                    args.repeat,
+                )
+                print(f"{page_count:>6} {label:<24} {seconds:>8.3f} {page_count / seconds:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
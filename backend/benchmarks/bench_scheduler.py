@@ -0,0 +1,174 @@
+"""Offline check of services/llm_scheduler.py against a rate-limited stub.
+
+Runs bursts of chat completions at benchmarks/fake_openai_server.py configured
+with a small requests-per-window limit and compares:
+
+    raw       the OpenAI client on its own (SDK retries off): how many calls are refused
+    paced     the scheduler with a budget matching the limit: no 429s at all
+    overshoot the scheduler with a budget 10x too high: 429s, Retry-After honoured, all succeed
+    async     the same with AsyncOpenAI through acomplete, as generate_quiz_chunked does
+    coalesce  identical prompts fired together: the stub should see exactly one call
+
+Exits non-zero if any expectation fails.
+
+Run from backend/:
+    python -m benchmarks.bench_scheduler --requests 20 --rate-limit 5 --window-s 2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import openai
+from openai import AsyncOpenAI, OpenAI
+
+from benchmarks.fake_openai_server import start_fake_openai
+from services.llm_scheduler import LLMScheduler
+
+
+def _request(i):
+    return {
+        "model": "gpt-4o-mini",
+        "messages": [{"role": "user", "content": f"Here are my notes:\nphotosynthesis chlorophyll {i}"}],
+        "response_format": {"type": "json_object"},
+    }
+
+
+def _fresh_server(args):
+    return start_fake_openai(args.llm_latency_ms, args.llm_latency_ms / 2,
+                             rate_limit=args.rate_limit, window_s=args.window_s)
+
+
+def _burst(call, count, workers):
+    outcomes = {"ok": 0, "error": 0}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(call, range(count)):
+            outcomes[result] += 1
+    return outcomes
+
+
+def _report(name, server, outcomes, elapsed, scheduler=None):
+    line = (f"{name:<10} ok {outcomes['ok']:>3}  errors {outcomes['error']:>3}  "
+            f"stub calls {server.stats['requests']:>3}  429s {server.stats['rate_limited']:>3}  "
+            f"max in flight {server.stats['max_in_flight']:>2}  {elapsed:6.2f}s")
+    if scheduler is not None:
+        line += f"  scheduler {dict(scheduler.stats)} limit {scheduler.limiter.limit:.2f}"
+    print(line)
+
+
+def run_raw(args):
+    server, base_url = _fresh_server(args)
+    client = OpenAI(api_key="offline", base_url=base_url, max_retries=0)
+
+    def call(i):
+        try:
+            client.chat.completions.create(**_request(i))
+            return "ok"
+        except openai.RateLimitError:
+            return "error"
+
+    started = time.perf_counter()
+    outcomes = _burst(call, args.requests, args.requests)
+    _report("raw", server, outcomes, time.perf_counter() - started)
+    server.shutdown()
+    return outcomes, server.stats
+
+
+def run_scheduled(args, name, rpm_multiplier):
+    server, base_url = _fresh_server(args)
+    client = OpenAI(api_key="offline", base_url=base_url, max_retries=0)
+    scheduler = LLMScheduler(requests_per_minute=args.rate_limit * rpm_multiplier, period_s=args.window_s,
+                             max_retries=10)
+
+    def call(i):
+        try:
+            scheduler.complete(client.chat.completions.create, **_request(i))
+            return "ok"
+        except openai.APIError:
+            return "error"
+
+    started = time.perf_counter()
+    outcomes = _burst(call, args.requests, args.requests)
+    _report(name, server, outcomes, time.perf_counter() - started, scheduler)
+    server.shutdown()
+    return outcomes, server.stats
+
+
+def run_async(args):
+    server, base_url = _fresh_server(args)
+    scheduler = LLMScheduler(requests_per_minute=args.rate_limit, period_s=args.window_s)
+
+    async def main():
+        client = AsyncOpenAI(api_key="offline", base_url=base_url, max_retries=0)
+        try:
+            await asyncio.gather(*(scheduler.acomplete(client.chat.completions.create, **_request(i))
+                                   for i in range(args.requests)))
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    outcomes = {"ok": args.requests, "error": 0}
+    _report("async", server, outcomes, time.perf_counter() - started, scheduler)
+    server.shutdown()
+    return outcomes, server.stats
+
+
+def run_coalesce(args):
+    server, base_url = _fresh_server(args)
+    client = OpenAI(api_key="offline", base_url=base_url, max_retries=0)
+    scheduler = LLMScheduler(requests_per_minute=args.rate_limit, period_s=args.window_s)
+
+    def call(_):
+        scheduler.complete(client.chat.completions.create, **_request("same"))
+        return "ok"
+
+    started = time.perf_counter()
+    outcomes = _burst(call, args.requests, args.requests)
+    _report("coalesce", server, outcomes, time.perf_counter() - started, scheduler)
+    server.shutdown()
+    return outcomes, server.stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--rate-limit", type=int, default=5, help="stub requests per window")
+    parser.add_argument("--window-s", type=float, default=2.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests against a stub allowing {args.rate_limit} per {args.window_s}s\n")
+    failures = []
+
+    raw, raw_stats = run_raw(args)
+    if raw["error"] == 0:
+        failures.append("raw burst was expected to be rate limited")
+
+    paced, paced_stats = run_scheduled(args, "paced", 1)
+    if paced["error"] or paced_stats["rate_limited"]:
+        failures.append("paced scheduler should finish every request without a 429")
+
+    overshoot, overshoot_stats = run_scheduled(args, "overshoot", 10)
+    if overshoot["error"]:
+        failures.append("scheduler should retry through 429s")
+
+    _, async_stats = run_async(args)
+    if async_stats["rate_limited"]:
+        failures.append("async scheduler should finish every request without a 429")
+
+    coalesced, coalesce_stats = run_coalesce(args)
+    if coalesced["error"] or coalesce_stats["requests"] != 1:
+        failures.append("identical in-flight prompts should reach the stub once")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
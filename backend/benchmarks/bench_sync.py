@@ -0,0 +1,98 @@
+"""Latency and throughput of GET /api/sync: the old to_dict()+jsonify path vs. the snapshot.
+
+Run from backend/:  python -m benchmarks.bench_sync [--quizzes 1000 10000] [--requests 50]
+
+Uses a throwaway SQLite database, so it never touches studybuddy.db.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_db_dir = tempfile.mkdtemp(prefix="studybuddy-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault("STUDYBUDDY_FAKE_LLM", "1")
+
+from flask import jsonify
+
+import app as studybuddy
+from database.models import db, Quiz
+from services import fake_llm, sync_snapshot
+
+
+def legacy_sync():
+    # /api/sync before the snapshot: decode every row, then re-encode everything
+    quizzes = Quiz.query.order_by(Quiz.created_at.desc()).all()
+    return jsonify({"quizzes": [q.to_dict() for q in quizzes]}), 200
+
+
+studybuddy.app.add_url_rule("/bench/legacy-sync", "bench_legacy_sync", legacy_sync)
+
+
+def fill_library(total):
+    with studybuddy.app.app_context():
+        have = Quiz.query.count()
+        quizzes = []
+        for i in range(have, total):
+            quiz_json = fake_llm.generate_quiz_from_text(f"lecture {i} " + "photosynthesis membrane enzyme " * 20)
+            quizzes.append(Quiz(filename=f"lecture-{i}.pdf", topic=quiz_json["meta"]["topic"],
+                                quiz_data=json.dumps(quiz_json)))
+        db.session.add_all(quizzes)
+        db.session.commit()
+
+
+def measure(client, path, requests, headers=None):
+    latencies = []
+    size = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        t = time.perf_counter()
+        response = client.get(path, headers=headers or {})
+        latencies.append((time.perf_counter() - t) * 1000)
+        size = len(response.get_data())
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return statistics.median(latencies), p99, requests / elapsed, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quizzes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--requests", type=int, default=30)
+    args = parser.parse_args()
+
+    client = studybuddy.app.test_client()
+    cases = [
+        ("legacy jsonify", "/bench/legacy-sync", None),
+        ("snapshot identity", "/api/sync", None),
+        ("snapshot gzip", "/api/sync", {"Accept-Encoding": "gzip"}),
+    ]
+    if sync_snapshot.brotli is not None:
+        cases.append(("snapshot br", "/api/sync", {"Accept-Encoding": "br"}))
+
+    print(f"{'quizzes':>8} {'mode':<18} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8} {'bytes':>10}")
+    for total in args.quizzes:
+        fill_library(total)
+
+        # first request after a change pays for the rebuild; a single new quiz
+        # only re-serializes that quiz
+        for label, added in (("rebuild", 0), ("rebuild +1 quiz", 1)):
+            fill_library(total + added)
+            t = time.perf_counter()
+            client.get("/api/sync")
+            print(f"{total:>8} {label:<18} {(time.perf_counter() - t) * 1000:>8.1f}")
+
+        for label, path, headers in cases:
+            p50, p99, rps, size = measure(client, path, args.requests, headers)
+            print(f"{total:>8} {label:<18} {p50:>8.1f} {p99:>8.1f} {rps:>8.1f} {size:>10}")
+
+
+if __name__ == "__main__":
+    main()
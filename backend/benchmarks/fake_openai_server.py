@@ -0,0 +1,153 @@
+"""Local OpenAI-compatible chat completions server for offline benchmarks.
+
+Answers POST /v1/chat/completions with a quiz built from the prompt after a
+configurable delay. Point the app at it with OPENAI_BASE_URL=http://host:port/v1.
+With a rate limit set it behaves like the real API when over budget: 429 with
+Retry-After / retry-after-ms headers and an OpenAI-style error body.
+
+Standalone:  python -m benchmarks.fake_openai_server --port 8765 --latency-ms 800 --rate-limit 60
+"""
+import argparse
+import json
+import random
+import re
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _quiz_for(prompt, question_count=5):
+    words = re.findall(r"[A-Za-z]{4,}", prompt) or ["notes"]
+    questions = []
+    for i in range(question_count):
+        term = words[(i * 7) % len(words)]
+        if i % 2 == 0:
+            questions.append({"id": i + 1, "type": "mcq", "question": f"Which term is from the notes? ({term} {i})",
+                              "options": [term, "alpha", "beta", "gamma"], "correct_index": 0,
+                              "explanation": "Taken from the notes."})
+        else:
+            questions.append({"id": i + 1, "type": "flashcard", "front": f"{term} {i}", "back": "A term from the notes"})
+    return {"meta": {"topic": " ".join(words[:3]).title(), "total_questions": question_count}, "questions": questions}
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        server = self.server
+        retry_after = server.admit()
+        if retry_after is not None:
+            self._send_json(429, {"error": {
+                "message": "Rate limit reached for requests. Please try again later.",
+                "type": "requests", "code": "rate_limit_exceeded",
+            }}, headers={"Retry-After": str(math.ceil(retry_after)),
+                         "retry-after-ms": str(int(retry_after * 1000))})
+            return
+
+        try:
+            delay = server.latency_ms + random.uniform(0, server.jitter_ms)
+            time.sleep(delay / 1000)
+        finally:
+            with server.stats_lock:
+                server.in_flight -= 1
+
+        prompt = "\n".join(m.get("content", "") for m in request.get("messages", []) if m.get("role") == "user")
+        content = json.dumps(_quiz_for(prompt))
+        self._send_json(200, {
+            "id": f"chatcmpl-fake-{server.stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                      "total_tokens": (len(prompt) + len(content)) // 4},
+        })
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms, jitter_ms, rate_limit, window_s):
+        super().__init__(address, FakeOpenAIHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit = rate_limit
+        self.window_s = window_s
+        self.in_flight = 0
+        self.stats = {"requests": 0, "rate_limited": 0, "max_in_flight": 0}
+        self.stats_lock = threading.Lock()
+        # like the real API the limit refills continuously rather than per fixed window
+        self._allowance = float(rate_limit)
+        self._updated = time.monotonic()
+
+    def admit(self):
+        """Count a request; returns None if accepted, else seconds until there is room."""
+        with self.stats_lock:
+            now = time.monotonic()
+            if self.rate_limit:
+                refill = self.rate_limit / self.window_s
+                self._allowance = min(self.rate_limit, self._allowance + (now - self._updated) * refill)
+                self._updated = now
+                if self._allowance < 1:
+                    self.stats["rate_limited"] += 1
+                    return (1 - self._allowance) / refill
+                self._allowance -= 1
+
+            self.stats["requests"] += 1
+            self.in_flight += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.in_flight)
+            return None
+
+
+def start_fake_openai(latency_ms=500, jitter_ms=0, host="127.0.0.1", port=0, rate_limit=0, window_s=60.0):
+    """Start the server on a background thread. Returns (server, base_url).
+
+    ``rate_limit`` requests per ``window_s`` (0 = unlimited), refilled continuously.
+    """
+    server = FakeOpenAIServer((host, port), latency_ms, jitter_ms, rate_limit, window_s)
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="requests per window, 0 = unlimited")
+    parser.add_argument("--window-s", type=float, default=60)
+    args = parser.parse_args()
+
+    server, base_url = start_fake_openai(args.latency_ms, args.jitter_ms, port=args.port,
+                                         rate_limit=args.rate_limit, window_s=args.window_s)
+    print(f"fake OpenAI listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
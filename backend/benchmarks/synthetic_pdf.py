@@ -0,0 +1,52 @@
+import random
+
+WORDS = (
+    "cell membrane protein enzyme energy glucose oxygen carbon photosynthesis "
+    "respiration mitochondria nucleus gene chromosome mutation evolution species "
+    "ecosystem population habitat climate molecule atom bond reaction catalyst"
+).split()
+
+
+def _page_lines(rng, lines_per_page):
+    return [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(lines_per_page)]
+
+
+def make_pdf(page_count, lines_per_page=40, seed=0):
+    """Build an uncompressed text-only PDF with ``page_count`` pages, in memory."""
+    rng = random.Random(seed)
+
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for i in range(page_count):
+        page_id, content_id = 4 + 2 * i, 5 + 2 * i
+        kids.append(f"{page_id} 0 R")
+
+        ops = ["BT", "/F1 10 Tf", "14 TL", "50 760 Td", f"(Page {i + 1}) Tj"]
+        ops += [f"T* ({line}) Tj" for line in _page_lines(rng, lines_per_page)]
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+
+        objects[page_id] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {page_count} >>".encode()
+
+    out = [b"%PDF-1.4\n"]
+    offset = len(out[0])
+    offsets = {}
+    for obj_id in sorted(objects):
+        chunk = b"%d 0 obj\n%s\nendobj\n" % (obj_id, objects[obj_id])
+        offsets[obj_id] = offset
+        out.append(chunk)
+        offset += len(chunk)
+
+    size = max(objects) + 1
+    out.append(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+    out.extend(b"%010d 00000 n \n" % offsets[obj_id] for obj_id in range(1, size))
+    out.append(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, offset))
+    return b"".join(out)
@@ -1,16 +1,25 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, func, insert, inspect, text
+from sqlalchemy.engine import Engine
 from datetime import datetime
 import json
+import sqlite3
 
 db = SQLAlchemy()
 
 class Quiz(db.Model):
+    # keyset pagination of /api/quizzes walks (created_at, id) newest first
+    __table_args__ = (db.Index("ix_quiz_created_at_id", "created_at", "id"),)
+
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(100), nullable=False)
     topic = db.Column(db.String(100), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # copied out of quiz_data.meta so listings never have to load the quiz body
+    total_questions = db.Column(db.Integer, nullable=True)
 
-    quiz_data = db.Column(db.Text, nullable=False)
+    # only loaded when accessed; use undefer(Quiz.quiz_data) when reading many full quizzes
+    quiz_data = db.deferred(db.Column(db.Text, nullable=False))
 
     # status for raspberry pi
     is_synced = db.Column(db.Boolean, default=False)
@@ -22,4 +31,108 @@ class Quiz(db.Model):
             "topic": self.topic,
             "created_at": self.created_at.isoformat(),
             "quiz_data": json.loads(self.quiz_data),
-        }
\ No newline at end of file
+        }
+
+    def to_summary_dict(self):
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "topic": self.topic,
+            "created_at": self.created_at.isoformat(),
+            "total_questions": self.total_questions,
+        }
+
+    @staticmethod
+    def count_questions(quiz_json):
+        meta_total = quiz_json.get("meta", {}).get("total_questions")
+        return meta_total if meta_total is not None else len(quiz_json.get("questions", []))
+
+
+# persistent LLM result cache, keyed by content hashes + generation settings
+class QuizCache(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    pdf_hash = db.Column(db.String(64), nullable=False, index=True)
+    text_hash = db.Column(db.String(64), nullable=False, index=True)
+
+    model = db.Column(db.String(50), nullable=False)
+    prompt_version = db.Column(db.String(20), nullable=False)
+    temperature = db.Column(db.Float, nullable=False)
+
+    quiz_data = db.Column(db.Text, nullable=False)
+    # how long the LLM call took, so hits can report the latency they saved
+    generation_ms = db.Column(db.Integer, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    hit_count = db.Column(db.Integer, default=0)
+
+
+# append-only log of quiz inserts/updates/deletes; its id is the /api/sync cursor
+class QuizChange(db.Model):
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    quiz_id = db.Column(db.Integer, nullable=False, index=True)
+    op = db.Column(db.String(10), nullable=False)  # "upsert" or "delete"
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# last cursor each raspberry pi acknowledged
+class DeviceSyncState(db.Model):
+    device_id = db.Column(db.String(64), primary_key=True)
+    cursor = db.Column(db.Integer, nullable=False, default=0)
+    last_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+def _log_change(connection, quiz_id, op):
+    connection.execute(
+        insert(QuizChange.__table__).values(quiz_id=quiz_id, op=op, created_at=datetime.utcnow())
+    )
+
+
+@event.listens_for(Quiz, "after_insert")
+@event.listens_for(Quiz, "after_update")
+def _quiz_upserted(mapper, connection, target):
+    _log_change(connection, target.id, "upsert")
+
+
+@event.listens_for(Quiz, "after_delete")
+def _quiz_deleted(mapper, connection, target):
+    _log_change(connection, target.id, "delete")
+
+
+def backfill_change_log():
+    # quizzes created before the change log existed get one upsert entry each
+    if db.session.query(func.count(QuizChange.id)).scalar():
+        return
+    ids = [row.id for row in db.session.query(Quiz.id).order_by(Quiz.created_at.asc(), Quiz.id.asc())]
+    if ids:
+        db.session.execute(insert(QuizChange.__table__), [{"quiz_id": i, "op": "upsert"} for i in ids])
+        db.session.commit()
+
+
+@event.listens_for(Engine, "connect")
+def _configure_sqlite(dbapi_connection, connection_record):
+    # WAL lets /api/quizzes and /api/sync read while an upload job is writing
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+
+def upgrade_schema():
+    # create_all() does not touch existing tables, so add what older databases miss
+    columns = {column["name"] for column in inspect(db.engine).get_columns("quiz")}
+    if "total_questions" not in columns:
+        with db.engine.begin() as connection:
+            connection.execute(text("ALTER TABLE quiz ADD COLUMN total_questions INTEGER"))
+            connection.execute(text(
+                "UPDATE quiz SET total_questions = COALESCE("
+                "json_extract(quiz_data, '$.meta.total_questions'), "
+                "json_array_length(quiz_data, '$.questions'))"
+            ))
+
+    for index in Quiz.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
@@ -0,0 +1,71 @@
+import asyncio
+import os
+import re
+import time
+
+from services.quiz_map_reduce import QUESTIONS_PER_CHUNK, generate_map_reduce
+
+# Offline stand-in for llm_generator, enabled with STUDYBUDDY_FAKE_LLM=1.
+# Builds a deterministic quiz from the text so uploads work without an API key.
+MODEL = "fake"
+TEMPERATURE = 0.0
+PROMPT_VERSION = "fake-v1"
+MAX_INPUT_CHARS = 15000
+MAX_DOCUMENT_CHARS = 200000
+CHUNK_CONCURRENCY = int(os.getenv("LLM_CHUNK_CONCURRENCY", "8"))
+
+LATENCY_MS = int(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+
+
+def _build_quiz(text, question_count):
+    words = re.findall(r"[A-Za-z]{4,}", text)
+    if not words:
+        words = ["notes"]
+
+    questions = []
+    for i in range(question_count):
+        term = words[(i * 7) % len(words)]
+        if i % 2 == 0:
+            questions.append({
+                "id": i + 1,
+                "type": "mcq",
+                "question": f"Which word appears in the notes? ({term}, {i + 1})",
+                "options": [term, "alpha", "beta", "gamma"],
+                "correct_index": 0,
+                "explanation": f"'{term}' is taken from the uploaded text.",
+            })
+        else:
+            questions.append({
+                "id": i + 1,
+                "type": "flashcard",
+                "front": term,
+                "back": f"A term from the notes ({i + 1})",
+            })
+
+    return {
+        "meta": {
+            "topic": " ".join(words[:3]).title(),
+            "total_questions": len(questions),
+        },
+        "questions": questions,
+    }
+
+
+def generate_quiz_from_text(text_context):
+    if LATENCY_MS:
+        time.sleep(LATENCY_MS / 1000)
+    return _build_quiz(text_context[:MAX_INPUT_CHARS], 5)
+
+
+def generate_quiz_chunked(text_context, on_chunk_done=None):
+    async def generate_chunk(index, chunk):
+        if LATENCY_MS:
+            await asyncio.sleep(LATENCY_MS / 1000)
+        return _build_quiz(chunk, QUESTIONS_PER_CHUNK)
+
+    return generate_map_reduce(
+        text_context[:MAX_DOCUMENT_CHARS],
+        generate_chunk,
+        CHUNK_CONCURRENCY,
+        on_chunk_done=on_chunk_done,
+    )
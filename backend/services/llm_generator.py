@@ -1,23 +1,49 @@
 import os
 import json
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from dotenv import load_dotenv
 
+from services.llm_scheduler import LLMScheduler
+from services.quiz_map_reduce import QUESTIONS_PER_CHUNK, generate_map_reduce
+
 # Load .env from project root (two levels up from services/)
 env_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
 load_dotenv(env_path)
 
-# Try both OPENAI_API_KEY and OPEN_API_KEY because i have written different names hehe
-api_key = os.getenv("OPENAI_API_KEY") or os.getenv("OPEN_API_KEY")
-if not api_key:
-    raise ValueError("OPENAI_API_KEY or OPEN_API_KEY environment variable is not set. Please check your .env file.")
+_client = None
 
-client = OpenAI(api_key=api_key)
+# every completion goes through the scheduler (rate limits, retries, coalescing),
+# so the SDK's own retry loop is switched off on both clients
+scheduler = LLMScheduler.from_env()
+
+
+def _get_api_key():
+    # Try both OPENAI_API_KEY and OPEN_API_KEY because i have written different names hehe
+    api_key = os.getenv("OPENAI_API_KEY") or os.getenv("OPEN_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY or OPEN_API_KEY environment variable is not set. Please check your .env file.")
+    return api_key
+
+
+def get_client():
+    # created on first use so the app can boot with the fake LLM and no key
+    global _client
+    if _client is None:
+        _client = OpenAI(api_key=_get_api_key(), max_retries=0)
+    return _client
 
-def generate_quiz_from_text(text_context):
-    trucated_text = text_context[:15000]
 
-    system_prompt = """
+# bump PROMPT_VERSION whenever the prompt changes so cached quizzes are not reused
+MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.5
+PROMPT_VERSION = "v1"
+MAX_INPUT_CHARS = 15000
+# longer documents are split into chunks and generated concurrently (see generate_quiz_chunked)
+MAX_DOCUMENT_CHARS = 200000
+# most chunks (= concurrent calls) one document is split into; within the scheduler's cap
+CHUNK_CONCURRENCY = min(int(os.getenv("LLM_CHUNK_CONCURRENCY", "8")), scheduler.limiter.maximum)
+
+SYSTEM_PROMPT = """
         You are a helpful study assistant. Your goal is to generate a quiz based strictly on the provided text.
         
         Output MUST be a valid JSON object with the following structure:
@@ -47,15 +73,20 @@ def generate_quiz_from_text(text_context):
         Generate exactly 5 questions. Mix "mcq" and "flashcard" types.
         """
 
+
+def generate_quiz_from_text(text_context):
+    trucated_text = text_context[:MAX_INPUT_CHARS]
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = scheduler.complete(
+            get_client().chat.completions.create,
+            model=MODEL,
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": f"Here are my notes:\n{trucated_text}"}
             ],
             response_format={"type": "json_object"},
-            temperature=0.5,
+            temperature=TEMPERATURE,
         )
 
         quiz_data = json.loads(response.choices[0].message.content)
@@ -63,4 +94,45 @@ def generate_quiz_from_text(text_context):
 
     except Exception as e:
         print(f"Error generating quiz: {e}")
-        raise e
\ No newline at end of file
+        raise e
+
+
+def _chunk_prompt(question_count):
+    return SYSTEM_PROMPT.replace(
+        "Generate exactly 5 questions.",
+        f"Generate exactly {question_count} questions.",
+    ).replace('"total_questions": 5', f'"total_questions": {question_count}')
+
+
+def generate_quiz_chunked(text_context, on_chunk_done=None):
+    """Map-reduce generation for long documents.
+
+    The text is split into at most CHUNK_CONCURRENCY chunks, each with its own
+    concurrent LLM call, then the chunk quizzes are deduped and merged. Returns
+    (quiz_data, report) with per-chunk latency in ``report["chunks"]``.
+    """
+    text_context = text_context[:MAX_DOCUMENT_CHARS]
+    system_prompt = _chunk_prompt(QUESTIONS_PER_CHUNK)
+    # one client per run: the async client is bound to the event loop it is used on
+    client = AsyncOpenAI(api_key=_get_api_key(), max_retries=0)
+
+    async def generate_chunk(index, chunk):
+        response = await scheduler.acomplete(
+            client.chat.completions.create,
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"Here is part {index + 1} of my notes:\n{chunk}"}
+            ],
+            response_format={"type": "json_object"},
+            temperature=TEMPERATURE,
+        )
+        return json.loads(response.choices[0].message.content)
+
+    return generate_map_reduce(
+        text_context,
+        generate_chunk,
+        CHUNK_CONCURRENCY,
+        on_chunk_done=on_chunk_done,
+        cleanup=client.close,
+    )
@@ -0,0 +1,358 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
+
+import openai
+
+from services.metrics import LLM_CONCURRENCY_LIMIT, LLM_REQUESTS, LLM_WAIT_SECONDS
+from services.quiz_map_reduce import estimate_tokens
+
+# quiz responses are a few hundred tokens; counted against the TPM budget up front
+COMPLETION_TOKENS_ESTIMATE = 800
+# budget slightly under the configured limits: the provider counts a request when it
+# arrives, we count it when we send it
+HEADROOM = 0.9
+
+
+class TokenBucket:
+    """``capacity`` units per ``period_s``, refilled continuously. Not thread-safe on its own."""
+
+    def __init__(self, capacity, period_s=60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period_s
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount, now):
+        # callers go into debt and wait it off, so concurrent callers queue up fairly
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def drain(self, now):
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+
+    def adjust(self, amount, now):
+        # correct an earlier reservation once the real usage is known
+        self._refill(now)
+        self.tokens = max(-self.capacity, self.tokens - amount)
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that grows while calls are fast and shrinks on slowdowns and errors (AIMD)."""
+
+    def __init__(self, initial, minimum, maximum, latency_tolerance=2.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self._baseline = None
+        self._cond = threading.Condition()
+        LLM_CONCURRENCY_LIMIT.set(self.limit)
+
+    def try_acquire(self):
+        with self._cond:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, outcome, latency=None):
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == "throttled":
+                self.limit = max(self.minimum, self.limit / 2)
+            elif outcome == "failed":
+                self.limit = max(self.minimum, self.limit * 0.75)
+            elif latency is not None:
+                # "fatal" and "cancelled" come without latency and leave the limit as is
+                if self._baseline is None:
+                    self._baseline = latency
+                if latency > self._baseline * self.latency_tolerance:
+                    # the provider is slowing down: back off gently
+                    self.limit = max(self.minimum, self.limit - 1)
+                else:
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                self._baseline = 0.95 * self._baseline + 0.05 * latency
+            LLM_CONCURRENCY_LIMIT.set(self.limit)
+            self._cond.notify_all()
+
+
+class _LeaderCancelled(Exception):
+    """The call a request was coalesced into was cancelled; the follower has to run its own."""
+
+
+def _retry_after_seconds(response):
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMScheduler:
+    """Gatekeeper for every chat completion call.
+
+    - requests-per-minute and tokens-per-minute token buckets (prompt size is estimated)
+    - identical in-flight requests are coalesced into one call (single-flight)
+    - 429s pause the whole scheduler for Retry-After; 5xx/connection errors back off exponentially
+    - an adaptive concurrency limit driven by observed latency and errors
+
+    ``complete`` is for the sync client, ``acomplete`` for the async one; both share the budgets.
+    """
+
+    def __init__(self, requests_per_minute=500, tokens_per_minute=200000, max_concurrency=16,
+                 min_concurrency=1, max_retries=5, base_backoff_s=0.5, max_backoff_s=60.0, period_s=60.0):
+        self.max_retries = max_retries
+        self.base_backoff_s = base_backoff_s
+        self.max_backoff_s = max_backoff_s
+
+        self._lock = threading.Lock()
+        self._requests = TokenBucket(requests_per_minute * HEADROOM, period_s)
+        self._tokens = TokenBucket(tokens_per_minute * HEADROOM, period_s)
+        self._paused_until = 0.0
+        self._flights = {}
+
+        # start at the cap and let errors and slowdowns bring it down
+        self.limiter = AdaptiveLimiter(max_concurrency, min_concurrency, max_concurrency)
+        self.stats = Counter()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            requests_per_minute=int(os.getenv("LLM_RPM", "500")),
+            tokens_per_minute=int(os.getenv("LLM_TPM", "200000")),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "16")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "5")),
+        )
+
+    # ---- shared helpers ----
+
+    def _count(self, outcome):
+        LLM_REQUESTS.inc(outcome=outcome)
+        with self._lock:
+            self.stats[outcome] += 1
+
+    @staticmethod
+    def _flight_key(kwargs):
+        return hashlib.sha256(json.dumps(kwargs, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _join_flight(self, key):
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                return future, False
+            future = self._flights[key] = Future()
+            # running futures cannot be cancelled, so a cancelled async follower
+            # (wrap_future propagates cancellation) does not take the flight down with it
+            future.set_running_or_notify_cancel()
+            return future, True
+
+    def _leave_flight(self, key, future):
+        with self._lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+
+    def _finish_flight(self, key, future, result=None, error=None):
+        # leave before resolving, so woken followers never re-join a finished flight
+        self._leave_flight(key, future)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    @staticmethod
+    def _estimate(kwargs):
+        prompt = sum(estimate_tokens(str(m.get("content", ""))) for m in kwargs.get("messages", []))
+        return prompt + kwargs.get("max_tokens", COMPLETION_TOKENS_ESTIMATE)
+
+    def _budget_wait(self, estimated):
+        with self._lock:
+            now = time.monotonic()
+            return max(
+                self._paused_until - now,
+                self._requests.reserve(1, now),
+                self._tokens.reserve(estimated, now),
+            )
+
+    def _pause_remaining(self):
+        # a 429 may have paused everyone while we were waiting for budget
+        with self._lock:
+            return self._paused_until - time.monotonic()
+
+    def _record_usage(self, response, estimated):
+        usage = getattr(response, "usage", None)
+        total = getattr(usage, "total_tokens", None)
+        if total:
+            with self._lock:
+                self._tokens.adjust(total - estimated, time.monotonic())
+
+    def _classify(self, exc):
+        """Return (outcome, server-requested delay or None); outcome "fatal" is not retried."""
+        if isinstance(exc, openai.RateLimitError):
+            return "throttled", _retry_after_seconds(exc.response)
+        if isinstance(exc, openai.APIStatusError) and (exc.status_code >= 500 or exc.status_code == 408):
+            return "failed", _retry_after_seconds(exc.response)
+        if isinstance(exc, openai.APIConnectionError):
+            return "failed", None
+        return "fatal", None
+
+    def _backoff(self, attempt, retry_after):
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff_s)
+        # exponential backoff with full jitter
+        return random.uniform(0, min(self.max_backoff_s, self.base_backoff_s * 2 ** attempt))
+
+    def _on_error(self, exc, attempt):
+        """Decide what to do after a failed call; returns seconds to sleep before retrying, or raises."""
+        outcome, retry_after = self._classify(exc)
+        # bad requests say nothing about provider capacity, so they leave the limit alone
+        self.limiter.release(outcome)
+        if outcome == "fatal" or attempt >= self.max_retries:
+            self._count("failed")
+            raise exc
+
+        delay = self._backoff(attempt, retry_after)
+        if outcome == "throttled":
+            # the budget is shared, so everyone waits out the Retry-After, and the request
+            # bucket is emptied so waiters come back spread out instead of all at once
+            with self._lock:
+                now = time.monotonic()
+                self._paused_until = max(self._paused_until, now + delay)
+                self._requests.drain(now)
+            self._count("throttled")
+            return 0.0
+
+        self._count("retried")
+        return delay
+
+    # ---- sync ----
+
+    def complete(self, call, **kwargs):
+        """Run ``call(**kwargs)`` (e.g. ``client.chat.completions.create``) under the scheduler."""
+        key = self._flight_key(kwargs)
+        while True:
+            future, leader = self._join_flight(key)
+            if leader:
+                break
+            self._count("coalesced")
+            try:
+                return future.result()
+            except _LeaderCancelled:
+                continue
+
+        try:
+            result = self._run(call, kwargs)
+        except Exception as e:
+            self._finish_flight(key, future, error=e)
+            raise
+        except BaseException:
+            # only this caller was interrupted; a follower takes over as the new leader
+            self._finish_flight(key, future, error=_LeaderCancelled())
+            raise
+        self._finish_flight(key, future, result)
+        return result
+
+    def _run(self, call, kwargs):
+        estimated = self._estimate(kwargs)
+        for attempt in range(self.max_retries + 1):
+            waited = time.perf_counter()
+            time.sleep(max(0.0, self._budget_wait(estimated)))
+            while (paused := self._pause_remaining()) > 0:
+                time.sleep(paused)
+            self.limiter.acquire()
+            LLM_WAIT_SECONDS.observe(time.perf_counter() - waited)
+
+            started = time.perf_counter()
+            try:
+                response = call(**kwargs)
+            except Exception as e:
+                time.sleep(self._on_error(e, attempt))
+                continue
+
+            self.limiter.release("ok", latency=time.perf_counter() - started)
+            self._record_usage(response, estimated)
+            self._count("ok")
+            return response
+
+    # ---- async ----
+
+    async def acomplete(self, call, **kwargs):
+        """Async twin of ``complete`` for ``AsyncOpenAI`` calls."""
+        key = self._flight_key(kwargs)
+        while True:
+            future, leader = self._join_flight(key)
+            if leader:
+                break
+            self._count("coalesced")
+            try:
+                return await asyncio.wrap_future(future)
+            except _LeaderCancelled:
+                continue
+
+        try:
+            result = await self._arun(call, kwargs)
+        except Exception as e:
+            self._finish_flight(key, future, error=e)
+            raise
+        except BaseException:
+            # e.g. the leader's chunk was cancelled: other jobs waiting on it run the call themselves
+            self._finish_flight(key, future, error=_LeaderCancelled())
+            raise
+        self._finish_flight(key, future, result)
+        return result
+
+    async def _arun(self, call, kwargs):
+        estimated = self._estimate(kwargs)
+        for attempt in range(self.max_retries + 1):
+            waited = time.perf_counter()
+            await asyncio.sleep(max(0.0, self._budget_wait(estimated)))
+            while (paused := self._pause_remaining()) > 0:
+                await asyncio.sleep(paused)
+            while not self.limiter.try_acquire():
+                await asyncio.sleep(0.01)
+            LLM_WAIT_SECONDS.observe(time.perf_counter() - waited)
+
+            started = time.perf_counter()
+            try:
+                response = await call(**kwargs)
+            except asyncio.CancelledError:
+                self.limiter.release("cancelled")
+                raise
+            except Exception as e:
+                await asyncio.sleep(self._on_error(e, attempt))
+                continue
+
+            self.limiter.release("ok", latency=time.perf_counter() - started)
+            self._record_usage(response, estimated)
+            self._count("ok")
+            return response
@@ -0,0 +1,171 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Minimal Prometheus client: counters, gauges and histograms rendered in the text
+# exposition format at GET /api/metrics.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+_registry = []
+
+
+def _label_key(labelnames, labels):
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {sorted(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, key, extra=()):
+    pairs = list(zip(labelnames, key)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.labelnames, key, [("le", "+Inf")])
+                lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+def render():
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---- studybuddy metrics ----
+
+UPLOAD_STAGE_SECONDS = Histogram(
+    "studybuddy_upload_stage_seconds",
+    "Time spent in each upload pipeline stage.",
+    labelnames=("stage",),
+)
+UPLOAD_JOBS = Counter(
+    "studybuddy_upload_jobs_total",
+    "Finished upload jobs by outcome.",
+    labelnames=("status",),
+)
+QUIZ_CACHE_LOOKUPS = Counter(
+    "studybuddy_quiz_cache_lookups_total",
+    "Quiz cache outcome per upload (hit or miss).",
+    labelnames=("result",),
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "studybuddy_http_request_seconds",
+    "HTTP request latency by endpoint.",
+    labelnames=("endpoint", "method", "status"),
+)
+SQL_QUERIES = Counter(
+    "studybuddy_sql_queries_total",
+    "SQL statements executed, inside and outside requests.",
+)
+SQL_QUERIES_PER_REQUEST = Histogram(
+    "studybuddy_sql_queries_per_request",
+    "SQL statements executed per HTTP request.",
+    labelnames=("endpoint",),
+    buckets=COUNT_BUCKETS,
+)
+SYNC_PAYLOAD_BYTES = Histogram(
+    "studybuddy_sync_payload_bytes",
+    "Size of sync response bodies as sent.",
+    labelnames=("endpoint", "encoding"),
+    buckets=SIZE_BUCKETS,
+)
+LLM_REQUESTS = Counter(
+    "studybuddy_llm_requests_total",
+    "LLM scheduler outcomes: ok, coalesced, retried, throttled, failed.",
+    labelnames=("outcome",),
+)
+LLM_WAIT_SECONDS = Histogram(
+    "studybuddy_llm_wait_seconds",
+    "Time an LLM call waited for rate-limit budget and a concurrency slot.",
+)
+LLM_CONCURRENCY_LIMIT = Gauge(
+    "studybuddy_llm_concurrency_limit",
+    "Current adaptive LLM concurrency limit.",
+)
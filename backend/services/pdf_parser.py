@@ -1,21 +1,98 @@
-from pypdf import PdfReader
+from pypdf import PdfReader, PdfWriter
 import io
 
-def extract_text_from_pdf(file_stream):
-    try:
-        reader = PdfReader(file_stream)
-        full_text = ""
+# documents are split into page ranges of this size across the process pool
+PAGES_PER_TASK = 16
+# page-range tasks kept in flight at once, so early termination wastes little work
+MAX_INFLIGHT_TASKS = 4
+
+
+def _page_range_pdf(reader, start, stop):
+    # a standalone sub-document holding only these pages, so a worker never parses the rest
+    writer = PdfWriter()
+    for i in range(start, stop):
+        writer.add_page(reader.pages[i])
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def _extract_page_range(pdf_bytes):
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    return [page.extract_text() or "" for page in reader.pages]
 
+
+def iter_page_text(file_stream, executor=None, pages_per_task=PAGES_PER_TASK, max_inflight=MAX_INFLIGHT_TASKS):
+    """Yield the text of each page in order.
+
+    With a process pool ``executor`` all extraction happens in the pool: short
+    documents go over as one task, longer ones as page-range sub-documents
+    extracted in parallel. Closing the generator early (e.g. once enough text
+    was collected) cancels the ranges that have not started yet.
+    """
+    pdf_bytes = file_stream.read()
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    page_count = len(reader.pages)
+
+    if executor is None:
         for page in reader.pages:
-            text = page.extract_text()
-            if text:
-                full_text += text + "\n"
+            yield page.extract_text() or ""
+        return
+
+    if page_count <= pages_per_task:
+        yield from executor.submit(_extract_page_range, pdf_bytes).result()
+        return
+
+    def submit(start, stop):
+        # sub-documents are built lazily, only for ranges that are actually requested
+        return executor.submit(_extract_page_range, _page_range_pdf(reader, start, stop))
+
+    ranges = iter(
+        (start, min(start + pages_per_task, page_count))
+        for start in range(0, page_count, pages_per_task)
+    )
+    pending = []
+    try:
+        for start, stop in ranges:
+            pending.append(submit(start, stop))
+            if len(pending) >= max_inflight:
+                break
+
+        while pending:
+            pages = pending.pop(0).result()
+            next_range = next(ranges, None)
+            if next_range is not None:
+                pending.append(submit(*next_range))
+            yield from pages
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def extract_text_from_pdf(file_stream, max_chars=None, executor=None):
+    try:
+        parts = []
+        collected = 0
+
+        pages = iter_page_text(file_stream, executor=executor)
+        try:
+            for text in pages:
+                if text:
+                    parts.append(text)
+                    collected += len(text) + 1
+
+                # downstream only uses max_chars, no need to read further
+                if max_chars is not None and collected >= max_chars:
+                    break
+        finally:
+            pages.close()
 
-            if not full_text.strip():
-                raise ValueError("No text found in the PDF")
+        full_text = "\n".join(parts)
+        if not full_text.strip():
+            raise ValueError("No text found in the PDF")
 
-            return full_text
+        return full_text + "\n"
 
     except Exception as e:
         print(f"Error extracting text from PDF: {e}")
-        raise e
\ No newline at end of file
+        raise e
@@ -0,0 +1,218 @@
+"""Compact binary quiz bundle served at /api/sync/bundle.
+
+Stdlib only, so the reader half can be copied onto the Raspberry Pi as-is.
+All integers are little-endian; offsets are absolute from the start of the file.
+
+    header      magic "SBQB", u16 version, u16 flags, u64 cursor, u32 quiz_count, u32 index_offset
+    quiz index  u32 offset of each quiz record, in /api/sync order (newest first)
+    quiz        u32 id, u32 question_count, u32 question offsets[question_count],
+                str filename, str topic, str created_at, str extra (quiz_data minus questions, JSON)
+    question    u8 kind, then
+                  mcq:       u32 id, str question, u16 option_count, str options..., i32 correct_index, str explanation
+                  flashcard: u32 id, str front, str back
+                  json:      str question as JSON (anything that does not fit the two layouts exactly)
+    str         u32 byte length (0xFFFFFFFF = null) followed by UTF-8 bytes
+"""
+import json
+import mmap
+import struct
+
+MAGIC = b"SBQB"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHQII")
+_U32 = struct.Struct("<I")
+_I32 = struct.Struct("<i")
+_U16 = struct.Struct("<H")
+_QUIZ_HEAD = struct.Struct("<II")
+_NULL = 0xFFFFFFFF
+
+KIND_MCQ = 0
+KIND_FLASHCARD = 1
+KIND_JSON = 255
+
+_MCQ_KEYS = {"id", "type", "question", "options", "correct_index", "explanation"}
+_FLASHCARD_KEYS = {"id", "type", "front", "back"}
+
+
+# ---- writer ----
+
+def _pack_str(value):
+    if value is None:
+        return _U32.pack(_NULL)
+    data = value.encode("utf-8")
+    return _U32.pack(len(data)) + data
+
+
+def _is_u32(value):
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value < _NULL
+
+
+def _pack_question(question):
+    kind = question.get("type")
+    if (kind == "mcq" and set(question) == _MCQ_KEYS and _is_u32(question["id"])
+            and isinstance(question["question"], str) and isinstance(question["explanation"], str)
+            and isinstance(question["options"], list) and len(question["options"]) < 0x10000
+            and all(isinstance(option, str) for option in question["options"])
+            and isinstance(question["correct_index"], int) and not isinstance(question["correct_index"], bool)
+            and -2**31 <= question["correct_index"] < 2**31):
+        parts = [bytes([KIND_MCQ]), _U32.pack(question["id"]), _pack_str(question["question"]),
+                 _U16.pack(len(question["options"]))]
+        parts += [_pack_str(option) for option in question["options"]]
+        parts += [_I32.pack(question["correct_index"]), _pack_str(question["explanation"])]
+        return b"".join(parts)
+
+    if (kind == "flashcard" and set(question) == _FLASHCARD_KEYS and _is_u32(question["id"])
+            and isinstance(question["front"], str) and isinstance(question["back"], str)):
+        return b"".join([bytes([KIND_FLASHCARD]), _U32.pack(question["id"]),
+                         _pack_str(question["front"]), _pack_str(question["back"])])
+
+    return bytes([KIND_JSON]) + _pack_str(json.dumps(question))
+
+
+def build_bundle(quizzes, cursor=0):
+    """Encode quizzes shaped like ``Quiz.to_dict()`` into bundle bytes."""
+    out = bytearray(_HEADER.size)
+    index_offset = len(out)
+    out += bytes(_U32.size * len(quizzes))
+
+    for position, quiz in enumerate(quizzes):
+        quiz_offset = len(out)
+        _U32.pack_into(out, index_offset + position * _U32.size, quiz_offset)
+
+        quiz_data = quiz["quiz_data"]
+        questions = quiz_data.get("questions", [])
+        extra = {key: value for key, value in quiz_data.items() if key != "questions"}
+
+        out += _QUIZ_HEAD.pack(quiz["id"], len(questions))
+        offsets_at = len(out)
+        out += bytes(_U32.size * len(questions))
+        out += _pack_str(quiz["filename"])
+        out += _pack_str(quiz["topic"])
+        out += _pack_str(quiz["created_at"])
+        out += _pack_str(json.dumps(extra))
+
+        for number, question in enumerate(questions):
+            _U32.pack_into(out, offsets_at + number * _U32.size, len(out))
+            out += _pack_question(question)
+
+    _HEADER.pack_into(out, 0, MAGIC, VERSION, 0, cursor, len(quizzes), index_offset)
+    return bytes(out)
+
+
+# ---- reader ----
+
+class BundleReader:
+    """Random access into a bundle without decoding the parts that are not asked for.
+
+    Works on any buffer; ``BundleReader.open(path)`` memory-maps a file so only
+    the pages that are actually read get loaded.
+    """
+
+    def __init__(self, buffer):
+        self._buf = memoryview(buffer)
+        magic, version, _flags, self.cursor, self.quiz_count, self._index_offset = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a quiz bundle")
+        if version != VERSION:
+            raise ValueError(f"Unsupported bundle version {version}")
+        self._file = None
+        self._mmap = None
+
+    @classmethod
+    def open(cls, path):
+        f = open(path, "rb")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        reader = cls(mapped)
+        reader._file, reader._mmap = f, mapped
+        return reader
+
+    def close(self):
+        self._buf.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _str(self, offset):
+        (length,) = _U32.unpack_from(self._buf, offset)
+        offset += _U32.size
+        if length == _NULL:
+            return None, offset
+        return str(self._buf[offset:offset + length], "utf-8"), offset + length
+
+    def _quiz_offset(self, position):
+        if not 0 <= position < self.quiz_count:
+            raise IndexError(position)
+        return _U32.unpack_from(self._buf, self._index_offset + position * _U32.size)[0]
+
+    def quiz_id(self, position):
+        return _U32.unpack_from(self._buf, self._quiz_offset(position))[0]
+
+    def find(self, quiz_id):
+        """Return the position of a quiz id, or None."""
+        for position in range(self.quiz_count):
+            if self.quiz_id(position) == quiz_id:
+                return position
+        return None
+
+    def question_count(self, position):
+        return _QUIZ_HEAD.unpack_from(self._buf, self._quiz_offset(position))[1]
+
+    def summary(self, position):
+        offset = self._quiz_offset(position)
+        quiz_id, count = _QUIZ_HEAD.unpack_from(self._buf, offset)
+        offset += _QUIZ_HEAD.size + count * _U32.size
+        filename, offset = self._str(offset)
+        topic, offset = self._str(offset)
+        created_at, offset = self._str(offset)
+        return {"id": quiz_id, "filename": filename, "topic": topic,
+                "created_at": created_at, "question_count": count}
+
+    def question(self, position, number):
+        quiz_offset = self._quiz_offset(position)
+        count = _QUIZ_HEAD.unpack_from(self._buf, quiz_offset)[1]
+        if not 0 <= number < count:
+            raise IndexError(number)
+        offset = _U32.unpack_from(self._buf, quiz_offset + _QUIZ_HEAD.size + number * _U32.size)[0]
+
+        kind = self._buf[offset]
+        offset += 1
+        if kind == KIND_JSON:
+            return json.loads(self._str(offset)[0])
+
+        (question_id,) = _U32.unpack_from(self._buf, offset)
+        offset += _U32.size
+        if kind == KIND_FLASHCARD:
+            front, offset = self._str(offset)
+            back, offset = self._str(offset)
+            return {"id": question_id, "type": "flashcard", "front": front, "back": back}
+
+        text, offset = self._str(offset)
+        (option_count,) = _U16.unpack_from(self._buf, offset)
+        offset += _U16.size
+        options = []
+        for _ in range(option_count):
+            option, offset = self._str(offset)
+            options.append(option)
+        (correct_index,) = _I32.unpack_from(self._buf, offset)
+        explanation, offset = self._str(offset + _I32.size)
+        return {"id": question_id, "type": "mcq", "question": text, "options": options,
+                "correct_index": correct_index, "explanation": explanation}
+
+    def quiz(self, position):
+        """Decode one whole quiz, shaped like ``Quiz.to_dict()``."""
+        summary = self.summary(position)
+        offset = self._quiz_offset(position) + _QUIZ_HEAD.size + summary["question_count"] * _U32.size
+        for _ in range(3):
+            offset = self._str(offset)[1]
+        quiz_data = json.loads(self._str(offset)[0])
+        quiz_data["questions"] = [self.question(position, n) for n in range(summary["question_count"])]
+
+        return {"id": summary["id"], "filename": summary["filename"], "topic": summary["topic"],
+                "created_at": summary["created_at"], "quiz_data": quiz_data}
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from database.models import db, QuizCache
+from services.metrics import QUIZ_CACHE_LOOKUPS
+
+MAX_ENTRIES = int(os.getenv("QUIZ_CACHE_MAX_ENTRIES", "500"))
+MAX_AGE_DAYS = int(os.getenv("QUIZ_CACHE_MAX_AGE_DAYS", "30"))
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "llm_ms_saved": 0}
+
+
+def hash_pdf_bytes(pdf_bytes):
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def hash_text(text):
+    # collapse whitespace so re-exported PDFs with the same content still match
+    normalized = " ".join(text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _settings_filter(query, model, prompt_version, temperature):
+    return query.filter_by(
+        model=model,
+        prompt_version=prompt_version,
+        temperature=temperature,
+    )
+
+
+def _record_hit(entry):
+    entry.hit_count = (entry.hit_count or 0) + 1
+    entry.last_used_at = datetime.utcnow()
+    db.session.commit()
+
+    QUIZ_CACHE_LOOKUPS.inc(result="hit")
+    with _stats_lock:
+        _stats["hits"] += 1
+        _stats["llm_ms_saved"] += entry.generation_ms or 0
+
+    return json.loads(entry.quiz_data)
+
+
+def lookup(model, prompt_version, temperature, pdf_hash=None, text_hash=None):
+    """Return the cached quiz dict for a pdf or text hash, or None."""
+    query = _settings_filter(QuizCache.query, model, prompt_version, temperature)
+
+    entry = None
+    if pdf_hash:
+        entry = query.filter_by(pdf_hash=pdf_hash).first()
+    if entry is None and text_hash:
+        entry = query.filter_by(text_hash=text_hash).first()
+
+    if entry is None:
+        return None
+    return _record_hit(entry)
+
+
+def record_miss():
+    QUIZ_CACHE_LOOKUPS.inc(result="miss")
+    with _stats_lock:
+        _stats["misses"] += 1
+
+
+def store(pdf_hash, text_hash, model, prompt_version, temperature, quiz_json, generation_ms):
+    entry = QuizCache(
+        pdf_hash=pdf_hash,
+        text_hash=text_hash,
+        model=model,
+        prompt_version=prompt_version,
+        temperature=temperature,
+        quiz_data=json.dumps(quiz_json),
+        generation_ms=int(generation_ms),
+    )
+    db.session.add(entry)
+    db.session.commit()
+    evict()
+    return entry
+
+
+def evict(max_entries=None, max_age_days=None):
+    """Drop entries older than max_age_days, then least recently used ones above max_entries."""
+    max_entries = MAX_ENTRIES if max_entries is None else max_entries
+    max_age_days = MAX_AGE_DAYS if max_age_days is None else max_age_days
+
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    removed = QuizCache.query.filter(QuizCache.created_at < cutoff).delete()
+
+    overflow = QuizCache.query.count() - max_entries
+    if overflow > 0:
+        stale_ids = [
+            row.id for row in
+            QuizCache.query.with_entities(QuizCache.id)
+            .order_by(QuizCache.last_used_at.asc(), QuizCache.id.asc())
+            .limit(overflow)
+        ]
+        removed += QuizCache.query.filter(QuizCache.id.in_(stale_ids)).delete(
+            synchronize_session=False
+        )
+
+    db.session.commit()
+    return removed
+
+
+def get_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    stats["entries"] = QuizCache.query.count()
+    return stats
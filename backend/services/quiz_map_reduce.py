@@ -0,0 +1,174 @@
+import asyncio
+import re
+import time
+
+# rough OpenAI tokenizer ratio for English prose
+CHARS_PER_TOKEN = 4
+CHUNK_TOKENS = 3500
+QUESTIONS_PER_CHUNK = 4
+MIN_QUESTIONS = 5
+MAX_QUESTIONS = 20
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_into_chunks(text, max_tokens=CHUNK_TOKENS):
+    """Split text into chunks of at most ``max_tokens``, preferring paragraph boundaries."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks = []
+    current = []
+    current_len = 0
+
+    for paragraph in re.split(r"\n\s*\n|\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+
+        # paragraphs longer than a whole chunk are hard-split
+        pieces = [paragraph[i:i + max_chars] for i in range(0, len(paragraph), max_chars)]
+        for piece in pieces:
+            if current and current_len + len(piece) + 1 > max_chars:
+                chunks.append("\n".join(current))
+                current, current_len = [], 0
+            current.append(piece)
+            current_len += len(piece) + 1
+
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def split_for_fan_out(text, max_chunks):
+    """Split text into at most ``max_chunks`` chunks of at least CHUNK_TOKENS.
+
+    Long documents get larger chunks instead of more of them, so every chunk
+    runs in one concurrent wave and wall time tracks the slowest chunk rather
+    than the document length.
+    """
+    max_tokens = max(CHUNK_TOKENS, -(-estimate_tokens(text) // max_chunks))
+    chunks = split_into_chunks(text, max_tokens)
+    while len(chunks) > max_chunks:
+        # paragraph boundaries leave some slack in each chunk
+        max_tokens = int(max_tokens * 1.1) + 1
+        chunks = split_into_chunks(text, max_tokens)
+    return chunks
+
+
+def _question_key(question):
+    text = question.get("question") or question.get("front") or ""
+    return " ".join(text.lower().split())
+
+
+def merge_quizzes(chunk_quizzes, total=None):
+    """Dedupe questions across chunk quizzes and pick a balanced mcq/flashcard set.
+
+    Questions are taken round-robin across chunks so every part of the
+    document is covered, alternating types until ``total`` is reached.
+    """
+    if total is None:
+        total = min(MAX_QUESTIONS, max(MIN_QUESTIONS, 2 * len(chunk_quizzes)))
+
+    seen = set()
+    pools = {"mcq": [], "flashcard": []}
+    for quiz in chunk_quizzes:
+        per_chunk = {"mcq": [], "flashcard": []}
+        for question in quiz.get("questions", []):
+            key = _question_key(question)
+            if question.get("type") not in per_chunk or not key or key in seen:
+                continue
+            seen.add(key)
+            per_chunk[question["type"]].append(question)
+        for kind in pools:
+            pools[kind].append(per_chunk[kind])
+
+    def round_robin(lists):
+        depth = 0
+        while any(depth < len(items) for items in lists):
+            for items in lists:
+                if depth < len(items):
+                    yield items[depth]
+            depth += 1
+
+    streams = {kind: round_robin(lists) for kind, lists in pools.items()}
+    selected = []
+    kinds = ["mcq", "flashcard"]
+    turn = 0
+    while len(selected) < total and streams:
+        kind = kinds[turn % len(kinds)]
+        turn += 1
+        if kind not in streams:
+            continue
+        question = next(streams[kind], None)
+        if question is None:
+            # this type ran out; keep filling from the other one
+            del streams[kind]
+            continue
+        selected.append(question)
+
+    questions = [dict(q, id=i + 1) for i, q in enumerate(selected)]
+    topic = next((q.get("meta", {}).get("topic") for q in chunk_quizzes if q.get("meta", {}).get("topic")), None)
+
+    return {
+        "meta": {"topic": topic, "total_questions": len(questions)},
+        "questions": questions,
+    }
+
+
+async def run_chunks(chunks, generate_chunk, max_concurrency, on_chunk_done=None):
+    """Run ``generate_chunk(index, chunk)`` for every chunk, at most ``max_concurrency`` at a time.
+
+    ``on_chunk_done(entry, chunk_count)`` is called as each chunk finishes.
+    Returns (quizzes of the chunks that succeeded, per-chunk report).
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    report = [None] * len(chunks)
+
+    async def run_one(index, chunk):
+        async with semaphore:
+            started = time.perf_counter()
+            entry = {"index": index, "chars": len(chunk), "latency_ms": 0, "error": None}
+            try:
+                quiz = await generate_chunk(index, chunk)
+            except Exception as e:
+                print(f"Error generating quiz for chunk {index}: {e}")
+                quiz = None
+                entry["error"] = str(e)
+            entry["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            report[index] = entry
+            if on_chunk_done:
+                on_chunk_done(entry, len(chunks))
+            return quiz
+
+    quizzes = await asyncio.gather(*(run_one(i, chunk) for i, chunk in enumerate(chunks)))
+    return [q for q in quizzes if q is not None], report
+
+
+def generate_map_reduce(text, generate_chunk, max_concurrency, on_chunk_done=None, cleanup=None):
+    """Chunk ``text``, generate a quiz per chunk concurrently and merge them.
+
+    The text is cut into at most ``max_concurrency`` chunks, so all of them are
+    in flight at once. ``cleanup`` is awaited on the same event loop once all
+    chunks are done. Returns (quiz, report) where report holds per-chunk
+    latency and the wall time.
+    """
+    chunks = split_for_fan_out(text, max_concurrency)
+    if not chunks:
+        raise ValueError("No text to generate a quiz from")
+
+    async def run():
+        try:
+            return await run_chunks(chunks, generate_chunk, max_concurrency, on_chunk_done)
+        finally:
+            if cleanup:
+                await cleanup()
+
+    started = time.perf_counter()
+    quizzes, chunk_report = asyncio.run(run())
+    wall_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    if not quizzes:
+        raise RuntimeError(f"Quiz generation failed for all {len(chunks)} chunks")
+
+    return merge_quizzes(quizzes), {"chunks": chunk_report, "wall_ms": wall_ms}
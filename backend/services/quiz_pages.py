@@ -0,0 +1,41 @@
+import base64
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import load_only
+
+from database.models import Quiz
+
+_SUMMARY_COLUMNS = (Quiz.id, Quiz.filename, Quiz.topic, Quiz.created_at, Quiz.total_questions)
+
+
+def encode_token(created_at, quiz_id):
+    raw = f"{created_at.isoformat()}|{quiz_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_token(token):
+    """Return the (created_at, id) position encoded in a page token, or None."""
+    if not token:
+        return None
+    try:
+        created_at, quiz_id = base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), int(quiz_id)
+    except Exception:
+        raise ValueError("Invalid page token")
+
+
+def summary_page(limit, after=None):
+    """Keyset page of quiz summaries, newest first. Returns (summaries, next token or None)."""
+    query = Quiz.query.options(load_only(*_SUMMARY_COLUMNS))
+    if after is not None:
+        created_at, quiz_id = after
+        query = query.filter(or_(
+            Quiz.created_at < created_at,
+            and_(Quiz.created_at == created_at, Quiz.id < quiz_id),
+        ))
+
+    rows = query.order_by(Quiz.created_at.desc(), Quiz.id.desc()).limit(limit + 1).all()
+    next_token = encode_token(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+
+    return [quiz.to_summary_dict() for quiz in rows[:limit]], next_token
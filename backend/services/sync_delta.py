@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+from sqlalchemy.orm import undefer
+
+from database.models import db, Quiz, QuizChange, DeviceSyncState
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+# polls that do not move a device's cursor only refresh last_seen_at this often
+DEVICE_SEEN_INTERVAL = timedelta(minutes=5)
+
+
+def current_cursor():
+    return db.session.query(func.max(QuizChange.id)).scalar() or 0
+
+
+def make_etag(since, limit, head):
+    # a delta page only depends on where it starts, its size and the library head
+    return f"sync-{since}-{limit}-{head}"
+
+
+def changes_since(since, limit):
+    """Return one page of changes after ``since`` as (quizzes, deleted_ids, cursor, has_more)."""
+    changes = (
+        QuizChange.query
+        .filter(QuizChange.id > since)
+        .order_by(QuizChange.id.asc())
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    if not changes:
+        return [], [], since, False
+
+    # only the latest op per quiz within the page matters
+    latest = {}
+    for change in changes:
+        latest.pop(change.quiz_id, None)
+        latest[change.quiz_id] = change.op
+
+    upsert_ids = [quiz_id for quiz_id, op in latest.items() if op == "upsert"]
+    rows = {}
+    if upsert_ids:
+        query = Quiz.query.options(undefer(Quiz.quiz_data)).filter(Quiz.id.in_(upsert_ids))
+        rows = {q.id: q for q in query}
+
+    quizzes = [rows[quiz_id].to_dict() for quiz_id in upsert_ids if quiz_id in rows]
+    # an upsert whose row is gone was deleted later, past this page
+    deleted = [quiz_id for quiz_id, op in latest.items() if op == "delete" or quiz_id not in rows]
+
+    return quizzes, deleted, changes[-1].id, has_more
+
+
+def touch_device(device_id, cursor):
+    now = datetime.utcnow()
+    state = db.session.get(DeviceSyncState, device_id)
+
+    if state is None:
+        db.session.add(DeviceSyncState(device_id=device_id, cursor=cursor, last_seen_at=now))
+    elif state.cursor != cursor or now - state.last_seen_at > DEVICE_SEEN_INTERVAL:
+        state.cursor = cursor
+        state.last_seen_at = now
+    else:
+        return
+
+    db.session.commit()
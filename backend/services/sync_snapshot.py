@@ -0,0 +1,128 @@
+import gzip
+import json
+import threading
+
+from sqlalchemy.orm import undefer
+
+from database.models import db, Quiz, QuizChange
+from services.quiz_bundle import build_bundle
+from services.sync_delta import current_cursor
+
+# brotli is optional; without it clients get gzip or identity
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+_COLUMNS = (Quiz.id, Quiz.filename, Quiz.topic, Quiz.created_at, Quiz.quiz_data)
+
+
+def _fragment(row):
+    # quiz_data is already a JSON document, so it is spliced in as-is instead of
+    # being decoded and re-encoded for every response
+    head = json.dumps({
+        "id": row.id,
+        "filename": row.filename,
+        "topic": row.topic,
+        "created_at": row.created_at.isoformat(),
+    }, separators=(",", ":"))
+    return f'{head[:-1]},"quiz_data":{row.quiz_data}}}'.encode("utf-8")
+
+
+class SyncSnapshot:
+    """Ready-to-send body of the full-mode /api/sync response.
+
+    The snapshot follows the QuizChange cursor: when the library head moves,
+    only the changed quizzes are re-read and re-serialized. Compressed
+    variants are built lazily, once per library version.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fragments = {}  # quiz id -> (sort key, serialized quiz)
+        self._cursor = None
+        self._encoded = {}
+
+    def get(self, encoding="identity"):
+        """Return (cursor, body bytes) for the requested content encoding."""
+        head = current_cursor()
+
+        with self._lock:
+            if self._cursor != head:
+                self._refresh(head)
+
+            body = self._encoded.get(encoding)
+            if body is None:
+                body = self._encode(self._encoded["identity"], encoding)
+                self._encoded[encoding] = body
+
+            return self._cursor, body
+
+    def _refresh(self, head):
+        if self._cursor is None:
+            changed_ids = None
+        else:
+            changed_ids = {
+                row.quiz_id for row in
+                db.session.query(QuizChange.quiz_id).filter(
+                    QuizChange.id > self._cursor, QuizChange.id <= head
+                )
+            }
+
+        query = db.session.query(*_COLUMNS)
+        if changed_ids is not None:
+            for quiz_id in changed_ids:
+                self._fragments.pop(quiz_id, None)
+            query = query.filter(Quiz.id.in_(list(changed_ids)))
+
+        for row in query:
+            self._fragments[row.id] = ((row.created_at, row.id), _fragment(row))
+
+        ordered = sorted(self._fragments.values(), key=lambda item: item[0], reverse=True)
+        body = b'{"cursor":%d,"quizzes":[%s]}' % (head, b",".join(frag for _, frag in ordered))
+
+        self._cursor = head
+        self._encoded = {"identity": body}
+
+    @staticmethod
+    def _encode(body, encoding):
+        if encoding == "gzip":
+            return gzip.compress(body, compresslevel=GZIP_LEVEL)
+        if encoding == "br":
+            return brotli.compress(body, quality=BROTLI_QUALITY)
+        raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class SyncBundle:
+    """Binary quiz bundle (see quiz_bundle.py), rebuilt once per library version."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cursor = None
+        self._body = None
+
+    def get(self):
+        """Return (cursor, bundle bytes)."""
+        head = current_cursor()
+
+        with self._lock:
+            if self._cursor != head:
+                quizzes = (
+                    Quiz.query.options(undefer(Quiz.quiz_data))
+                    .order_by(Quiz.created_at.desc(), Quiz.id.desc())
+                )
+                self._body = build_bundle([q.to_dict() for q in quizzes], cursor=head)
+                self._cursor = head
+
+            return self._cursor, self._body
+
+
+def pick_encoding(accept_encodings):
+    if brotli is not None and accept_encodings["br"]:
+        return "br"
+    if accept_encodings["gzip"]:
+        return "gzip"
+    return "identity"
@@ -0,0 +1,230 @@
+import io
+import json
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from database.models import db, Quiz
+from services import quiz_cache
+from services.metrics import UPLOAD_JOBS, UPLOAD_STAGE_SECONDS
+from services.pdf_parser import extract_text_from_pdf
+
+# stage -> overall progress reported by GET /api/jobs/<id>
+STAGES = {
+    "queued": 0.0,
+    "extracting": 0.1,
+    "generating": 0.4,
+    "saving": 0.9,
+    "done": 1.0,
+    "failed": 1.0,
+}
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class UploadJob:
+    def __init__(self, filename):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.stage = "queued"
+        self.result = None
+        self.error = None
+        # per-chunk latency report while a long document is generated in chunks
+        self.chunks = []
+        self.chunk_total = 0
+        self.created_at = datetime.utcnow()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.stage in ("done", "failed")
+
+    def record_chunk(self, entry, total):
+        self.chunk_total = total
+        self.chunks.append(entry)
+
+    @property
+    def progress(self):
+        if self.stage == "generating" and self.chunk_total:
+            span = STAGES["saving"] - STAGES["generating"]
+            return round(STAGES["generating"] + span * len(self.chunks) / self.chunk_total, 3)
+        return STAGES[self.stage]
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "stage": self.stage,
+            "progress": self.progress,
+            "chunks": self.chunks,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+        }
+
+
+class UploadJobQueue:
+    """Runs upload pipelines (extract -> generate -> save) off the request thread.
+
+    LLM calls run on a thread pool, PDF parsing on a process pool. With
+    ``chunked`` set, documents longer than the LLM input budget are generated
+    chunk by chunk (``llm.generate_quiz_chunked``) instead of truncated. At most
+    ``max_workers + max_queued`` jobs may be pending; past that ``submit``
+    raises QueueFullError so the caller can push back on the client.
+    """
+
+    def __init__(self, app, llm, max_workers=4, parse_workers=2, max_queued=16, keep_finished=200, chunked=True):
+        self.app = app
+        self.llm = llm
+        self.chunked = chunked
+        self.keep_finished = keep_finished
+
+        self._workers = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upload-job")
+        self._parse_workers = parse_workers
+        self._parse_pool = None
+        self._slots = threading.BoundedSemaphore(max_workers + max_queued)
+
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _get_parse_pool(self):
+        with self._lock:
+            if self._parse_pool is None:
+                # not fork: this runs on a job thread of a process full of threads and DB connections
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._parse_pool = ProcessPoolExecutor(
+                    max_workers=self._parse_workers,
+                    mp_context=multiprocessing.get_context(method),
+                )
+            return self._parse_pool
+
+    def _discard_parse_pool(self, pool):
+        with self._lock:
+            if self._parse_pool is pool:
+                self._parse_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _extract(self, pdf_bytes, max_chars):
+        for attempt in range(2):
+            pool = self._get_parse_pool()
+            try:
+                return extract_text_from_pdf(io.BytesIO(pdf_bytes), max_chars=max_chars, executor=pool)
+            except BrokenProcessPool:
+                # a worker died (OOM kill, crash on a bad PDF): the pool is unusable from now on,
+                # so replace it and give this job one more go on the fresh one
+                self._discard_parse_pool(pool)
+                if attempt:
+                    raise
+
+    def submit(self, pdf_bytes, filename):
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError("Upload queue is full, try again shortly")
+
+        job = UploadJob(filename)
+        try:
+            with self._lock:
+                self._jobs[job.id] = job
+                self._prune()
+
+            self._workers.submit(self._run, job, pdf_bytes)
+        except BaseException:
+            # the job never started, so _run will not give the slot back
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            self._slots.release()
+            raise
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait=True):
+        self._workers.shutdown(wait=wait)
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=wait)
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j.finished]
+        if len(finished) <= self.keep_finished:
+            return
+        finished.sort(key=lambda j: j.finished_at or 0)
+        for job in finished[:len(finished) - self.keep_finished]:
+            del self._jobs[job.id]
+
+    def _run(self, job, pdf_bytes):
+        stage = "failed"
+        try:
+            with self.app.app_context(), UPLOAD_STAGE_SECONDS.time(stage="total"):
+                job.result = self._pipeline(job, pdf_bytes)
+            stage = "done"
+        except Exception as e:
+            print(f"Error in upload job {job.id}: {e}")
+            job.error = str(e)
+        finally:
+            # finished_at before the terminal stage: _prune sorts finished jobs by it
+            job.finished_at = time.monotonic()
+            job.stage = stage
+            UPLOAD_JOBS.inc(status=stage)
+            self._slots.release()
+
+    def _pipeline(self, job, pdf_bytes):
+        llm = self.llm
+        # chunked results differ from truncated ones, so they are cached separately
+        prompt_version = f"{llm.PROMPT_VERSION}-chunked" if self.chunked else llm.PROMPT_VERSION
+        settings = dict(model=llm.MODEL, prompt_version=prompt_version, temperature=llm.TEMPERATURE)
+
+        # 1. Same PDF seen before -> skip parsing and the LLM entirely
+        with UPLOAD_STAGE_SECONDS.time(stage="cache_lookup"):
+            pdf_hash = quiz_cache.hash_pdf_bytes(pdf_bytes)
+            quiz_json = quiz_cache.lookup(pdf_hash=pdf_hash, **settings)
+        cached = quiz_json is not None
+
+        if not cached:
+            # 2. Parse PDF page ranges in worker processes, only as far as the LLM will read,
+            #    then try again on the normalized text
+            job.stage = "extracting"
+            with UPLOAD_STAGE_SECONDS.time(stage="extract"):
+                extracted_text = self._extract(
+                    pdf_bytes,
+                    max_chars=llm.MAX_DOCUMENT_CHARS if self.chunked else llm.MAX_INPUT_CHARS,
+                )
+            with UPLOAD_STAGE_SECONDS.time(stage="cache_lookup"):
+                text_hash = quiz_cache.hash_text(extracted_text)
+                quiz_json = quiz_cache.lookup(text_hash=text_hash, **settings)
+            cached = quiz_json is not None
+
+        if not cached:
+            # 3. Cache miss -> generate and remember the result
+            job.stage = "generating"
+            quiz_cache.record_miss()
+            started = time.perf_counter()
+            if self.chunked and len(extracted_text) > llm.MAX_INPUT_CHARS:
+                quiz_json, _report = llm.generate_quiz_chunked(extracted_text, on_chunk_done=job.record_chunk)
+            else:
+                quiz_json = llm.generate_quiz_from_text(extracted_text)
+            generation_ms = (time.perf_counter() - started) * 1000
+            UPLOAD_STAGE_SECONDS.observe(generation_ms / 1000, stage="generate")
+            quiz_cache.store(pdf_hash, text_hash, quiz_json=quiz_json,
+                             generation_ms=generation_ms, **settings)
+
+        job.stage = "saving"
+        topic = quiz_json.get("meta", {}).get("topic") or job.filename
+
+        new_quiz = Quiz(
+            filename=job.filename,
+            topic=topic,
+            total_questions=Quiz.count_questions(quiz_json),
+            quiz_data=json.dumps(quiz_json)
+        )
+        db.session.add(new_quiz)
+        with UPLOAD_STAGE_SECONDS.time(stage="commit"):
+            db.session.commit()
+
+        return {"quiz_id": new_quiz.id, "topic": new_quiz.topic, "cached": cached}
@@ -2,6 +2,18 @@ import { useState } from "react";
 import api from "../api";
 import { Button } from "@/components/ui/button";
 
+const POLL_INTERVAL_MS = 1000;
+
+// uploads are processed in the background; poll the job until it settles
+const waitForJob = async (jobId) => {
+  for (;;) {
+    const { data: job } = await api.get(`/jobs/${jobId}`);
+    if (job.stage === "done") return job;
+    if (job.stage === "failed") throw new Error(job.error || "Upload failed");
+    await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+  }
+};
+
 const UploadBox = ({ onUploadSuccess }) => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
@@ -23,9 +35,10 @@ const UploadBox = ({ onUploadSuccess }) => {
 
     try {
       const response = await api.post("/upload", formData);
+      const job = await waitForJob(response.data.job_id);
 
       if (onUploadSuccess) {
-        onUploadSuccess(response.data);
+        onUploadSuccess(job.result);
       }
     } catch (err) {
       console.error(err);
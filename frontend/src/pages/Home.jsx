@@ -3,15 +3,25 @@ import api from "../api";
 import UploadBox from "../components/UploadBox";
 import QuizCard from "../components/QuizCard";
 import { Card } from "@/components/ui/card";
+import { Button } from "@/components/ui/button";
+
+const PAGE_SIZE = 20;
 
 const Home = () => {
   const [quizzes, setQuizzes] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
   const [loadingData, setLoadingData] = useState(true);
 
-  const fetchQuizzes = async () => {
+  // summaries only; the full quiz body lives behind /quizzes/:id
+  const fetchQuizzes = async (after = null) => {
     try {
-      const response = await api.get("/sync");
-      setQuizzes(response.data.quizzes);
+      const response = await api.get("/quizzes", {
+        params: { limit: PAGE_SIZE, ...(after && { after }) },
+      });
+      setQuizzes((current) =>
+        after ? [...current, ...response.data.quizzes] : response.data.quizzes
+      );
+      setNextPage(response.data.next);
     } catch (error) {
       console.error("Failed to fetch quizzes:", error);
     } finally {
@@ -54,7 +64,9 @@ const Home = () => {
           </h2>
           {quizzes.length > 0 && !loadingData && (
             <span className="text-xs text-slate-400">
-              {quizzes.length} {quizzes.length === 1 ? "quiz" : "quizzes"}
+              {quizzes.length}
+              {nextPage ? "+" : ""}{" "}
+              {quizzes.length === 1 ? "quiz" : "quizzes"}
             </span>
           )}
         </div>
@@ -70,6 +82,16 @@ const Home = () => {
             {quizzes.map((quiz) => (
               <QuizCard key={quiz.id} quiz={quiz} />
             ))}
+            {nextPage && (
+              <Button
+                variant="outline"
+                size="sm"
+                onClick={() => fetchQuizzes(nextPage)}
+                className="border-slate-600 bg-slate-900 text-slate-50 hover:bg-slate-800"
+              >
+                Load more
+              </Button>
+            )}
           </div>
         )}
       </section>